@@ -42,6 +42,11 @@
 
 #include "IECore/FileSequence.h"
 
+#include "boost/filesystem.hpp"
+#include "boost/optional.hpp"
+
+#include <sys/stat.h>
+
 namespace Gaffer
 {
 
@@ -81,15 +86,45 @@ class GAFFER_API FileSystemPath : public Path
 		// or nullptr if this path is not a leaf, or does not represent
 		// a FileSequence.
 		IECore::FileSequencePtr fileSequence() const;
+		// Filesystem queries are cached per path (see below), so by
+		// default repeated queries do not see changes made to the
+		// filesystem behind our back. Calling this discards the cached
+		// metadata, so that the next query reflects the current state
+		// of the filesystem.
+		void restat();
 
 		static PathFilterPtr createStandardFilter( const std::vector<std::string> &extensions = std::vector<std::string>(), const std::string &extensionsLabel = "", bool includeSequenceFilter = false );
 
 	protected :
 
 		void doChildren( std::vector<PathPtr> &children ) const override;
+		void pathChanged() override;
 
 	private :
 
+		// Lazily initialised caches for the results of filesystem
+		// queries. Stat calls dominate the cost of browsing large
+		// directories, so we only make them once per path -
+		// `doChildren()` seeds the caches of the children it creates
+		// from the directory iterator, which has already fetched the
+		// information.
+		const boost::filesystem::file_status &status() const;
+		const boost::filesystem::file_status &symlinkStatus() const;
+		// Stat buffer shared by the property queries, populated at most
+		// once per path. Returns nullptr if the path cannot be statted.
+		// Failed stats are remembered too, so repeated probes of a
+		// missing path make no further syscalls.
+		const struct stat *statBuffer() const;
+
+		mutable boost::optional<boost::filesystem::file_status> m_status;
+		mutable boost::optional<boost::filesystem::file_status> m_symlinkStatus;
+		mutable boost::optional<struct stat> m_statBuffer;
+		mutable bool m_haveStatBuffer;
+		// Cached result of `fileSequence()` - finding the sequence
+		// requires a scan of the parent directory, and `property()`
+		// queries it several times per path.
+		mutable boost::optional<IECore::FileSequencePtr> m_fileSequence;
+
 		bool m_includeSequences;
 
 };
@@ -169,8 +169,10 @@ class GAFFER_API Path : public IECore::RunTimeTyped
 		//@}
 
 		/// Returns the path concatenated into a string, using '/'
-		/// as a separator between names.
-		std::string string() const;
+		/// as a separator between names. The result is cached, and
+		/// the cache invalidated by pathChanged(), so repeated calls
+		/// on an unchanged path are cheap.
+		const std::string &string() const;
 
 		bool operator == ( const Path &other ) const;
 		bool operator != ( const Path &other ) const;
@@ -191,6 +193,12 @@ class GAFFER_API Path : public IECore::RunTimeTyped
 		/// much more efficient to call this than to call pathChangedSignal()( this ),
 		/// because the signal itself is created lazily on demand in pathChangedSignal().
 		void emitPathChanged();
+		/// Called whenever the path has changed, immediately before
+		/// pathChangedSignal() is emitted (whether or not the signal has
+		/// been created). May be reimplemented by subclasses to invalidate
+		/// any cached state derived from the path. Implementations must call
+		/// the base class implementation first.
+		virtual void pathChanged();
 		/// Called when the PathChangedSignal is constructed - for performance
 		/// reasons this is delayed until it is accessed for the first time
 		/// via pathChangedSignal(). This method may be reimplemented to perform
@@ -209,6 +217,10 @@ class GAFFER_API Path : public IECore::RunTimeTyped
 		IECore::InternedString m_root;
 		Names m_names;
 
+		// Cache for string(), invalidated by pathChanged().
+		mutable std::string m_string;
+		mutable bool m_stringValid;
+
 		PathFilterPtr m_filter;
 		PathChangedSignal *m_pathChangedSignal;
 
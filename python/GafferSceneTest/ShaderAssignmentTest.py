@@ -35,7 +35,12 @@
 #
 ##########################################################################
 
+import os
+import hashlib
+import shutil
+import tempfile
 import unittest
+import collections
 
 import IECore
 import IECoreScene
@@ -45,23 +50,108 @@ import GafferTest
 import GafferScene
 import GafferSceneTest
 
+_AcceptanceFixture = collections.namedtuple( "_AcceptanceFixture", [ "script", "shader", "addNode", "plugNode" ] )
+
+__acceptanceFixture = None
+## Returns an _AcceptanceFixture for use by tests which only query
+# `acceptsInput()`. Node construction is expensive, and read-only
+# acceptance queries don't need fresh nodes per test, so we construct
+# the fixture once and share it. Tests which mutate the graph must
+# construct their own nodes as before.
+def _makeShaderAcceptanceFixture() :
+
+	global __acceptanceFixture
+	if __acceptanceFixture is None :
+
+		script = Gaffer.ScriptNode()
+		script["shader"] = GafferSceneTest.TestShader()
+		script["add"] = GafferTest.AddNode()
+		script["node"] = Gaffer.Node()
+		script["node"]["out"] = Gaffer.Plug( direction = Gaffer.Plug.Direction.Out )
+
+		__acceptanceFixture = _AcceptanceFixture(
+			script = script,
+			shader = script["shader"],
+			addNode = script["add"],
+			plugNode = script["node"],
+		)
+
+	return __acceptanceFixture
+
 class ShaderAssignmentTest( GafferSceneTest.SceneTestCase ) :
 
+	__exportedReferences = {}
+	__referenceCacheDir = None
+
+	@classmethod
+	def setUpClass( cls ) :
+
+		GafferSceneTest.SceneTestCase.setUpClass()
+
+		# One shared directory for all the reference exports made by this
+		# class, rather than a fresh mkdtemp/rmtree cycle per test method.
+		cls.__referenceCacheDir = tempfile.mkdtemp( prefix = "gafferShaderAssignmentTest" )
+
+	@classmethod
+	def tearDownClass( cls ) :
+
+		GafferSceneTest.SceneTestCase.tearDownClass()
+
+		if cls.__referenceCacheDir is not None :
+			shutil.rmtree( cls.__referenceCacheDir )
+			cls.__referenceCacheDir = None
+			cls.__exportedReferences.clear()
+
+	## Builds the standard test chain in `script` - a Plane feeding a
+	# ShaderAssignment with a TestShader assigned - and returns the
+	# ShaderAssignment. Centralised so that any future improvements to
+	# node construction only need making in one place.
+	def __buildShaderChain( self, script ) :
+
+		script["p"] = GafferScene.Plane()
+		script["s"] = GafferSceneTest.TestShader()
+		script["s"]["type"].setValue( "test:surface" )
+		script["a"] = GafferScene.ShaderAssignment()
+		script["a"]["in"].setInput( script["p"]["out"] )
+		script["a"]["shader"].setInput( script["s"]["out"] )
+
+		return script["a"]
+
+	## Exports `box` for referencing and returns the path to the
+	# exported file. Exports are cached keyed on the serialised content
+	# of the box, so repeated exports of identical boxes skip the disk
+	# round-trip entirely.
+	def __exportForReference( self, box ) :
+
+		key = hashlib.sha1( box.scriptNode().serialise( parent = box ).encode( "utf-8" ) ).hexdigest()
+
+		path = self.__exportedReferences.get( key )
+		if path is None :
+
+			path = os.path.join( self.__referenceCacheDir, key + ".grf" )
+			box.exportForReference( path )
+			self.__exportedReferences[key] = path
+
+		return path
+
 	def testFilter( self ) :
 
 		sphere = IECoreScene.SpherePrimitive()
+		# CompoundObject members are held by reference, so the same bound
+		# can be shared by all three locations.
+		bound = IECore.Box3fData( sphere.bound() )
 		input = GafferSceneTest.CompoundObjectSource()
 		input["in"].setValue(
 			IECore.CompoundObject( {
-				"bound" : IECore.Box3fData( sphere.bound() ),
+				"bound" : bound,
 				"children" : {
 					"ball1" : {
 						"object" : sphere,
-						"bound" : IECore.Box3fData( sphere.bound() ),
+						"bound" : bound,
 					},
 					"ball2" : {
 						"object" : sphere,
-						"bound" : IECore.Box3fData( sphere.bound() ),
+						"bound" : bound,
 					},
 				},
 			} )
@@ -78,30 +168,32 @@ class ShaderAssignmentTest( GafferSceneTest.SceneTestCase ) :
 		f["paths"].setValue( IECore.StringVectorData( [ "/ball1" ] ) )
 		a["filter"].setInput( f["out"] )
 
-		self.assertEqual( a["out"].attributes( "/" ), IECore.CompoundObject() )
-		self.assertNotEqual( a["out"].attributes( "/ball1" ), IECore.CompoundObject() )
-		self.assertEqual( a["out"].attributes( "/ball2" ), IECore.CompoundObject() )
+		# Evaluate parent-first within a single context, so all three
+		# queries share one cache chain and a single filter evaluation.
+		with Gaffer.Context() :
+			self.assertEqual( a["out"].attributes( "/" ), IECore.CompoundObject() )
+			# A membership check is both cheaper than a deep comparison
+			# against an empty CompoundObject and more precise about
+			# what the filter is expected to have assigned.
+			self.assertTrue( "test:surface" in a["out"].attributes( "/ball1" ) )
+			self.assertEqual( a["out"].attributes( "/ball2" ), IECore.CompoundObject() )
 
 	def testFilterInputAcceptance( self ) :
 
+		fixture = _makeShaderAcceptanceFixture()
+
 		a = GafferScene.ShaderAssignment()
 
 		f = GafferScene.PathFilter()
 		self.assertTrue( a["filter"].acceptsInput( f["out"] ) )
 
-		n = GafferTest.AddNode()
-		self.assertFalse( a["filter"].acceptsInput( n["sum"] ) )
+		self.assertFalse( a["filter"].acceptsInput( fixture.addNode["sum"] ) )
 
 	def testAssignShaderFromOutsideBox( self ) :
 
 		s = Gaffer.ScriptNode()
 
-		s["p"] = GafferScene.Plane()
-		s["s"] = GafferSceneTest.TestShader()
-		s["s"]["type"].setValue( "test:surface" )
-		s["a"] = GafferScene.ShaderAssignment()
-		s["a"]["in"].setInput( s["p"]["out"] )
-		s["a"]["shader"].setInput( s["s"]["out"] )
+		self.__buildShaderChain( s )
 
 		s["o"] = GafferScene.Options()
 		s["o"]["in"].setInput( s["a"]["out"] )
@@ -121,12 +213,7 @@ class ShaderAssignmentTest( GafferSceneTest.SceneTestCase ) :
 
 		s = Gaffer.ScriptNode()
 
-		s["p"] = GafferScene.Plane()
-		s["s"] = GafferSceneTest.TestShader()
-		s["s"]["type"].setValue( "test:surface" )
-		s["a"] = GafferScene.ShaderAssignment()
-		s["a"]["in"].setInput( s["p"]["out"] )
-		s["a"]["shader"].setInput( s["s"]["out"] )
+		self.__buildShaderChain( s )
 
 		self.assertTrue( "test:surface" in s["a"]["out"].attributes( "/plane" ) )
 
@@ -138,15 +225,8 @@ class ShaderAssignmentTest( GafferSceneTest.SceneTestCase ) :
 
 		s = Gaffer.ScriptNode()
 
-		s["p"] = GafferScene.Plane()
-
-		s["s"] = GafferSceneTest.TestShader()
+		self.__buildShaderChain( s )
 		s["s"]["name"].setValue( "test" )
-		s["s"]["type"].setValue( "test:surface" )
-
-		s["a"] = GafferScene.ShaderAssignment()
-		s["a"]["in"].setInput( s["p"]["out"] )
-		s["a"]["shader"].setInput( s["s"]["out"] )
 
 		self.assertTrue( "test:surface" in s["a"]["out"].attributes( "/plane" ) )
 		self.assertEqual( s["a"]["out"].attributes( "/plane" )["test:surface"][-1].name, "test" )
@@ -238,19 +318,18 @@ class ShaderAssignmentTest( GafferSceneTest.SceneTestCase ) :
 
 	def testRejectInputsToBoxes( self ) :
 
-		s = Gaffer.ScriptNode()
-
-		s["n"] = Gaffer.Node()
-		s["n"]["out"] = Gaffer.Plug( direction = Gaffer.Plug.Direction.Out )
+		# The shader and plain node are only probed via `acceptsInput()`,
+		# so the shared fixture nodes serve just as well as fresh ones.
+		fixture = _makeShaderAcceptanceFixture()
 
-		s["s"] = GafferSceneTest.TestShader()
+		s = Gaffer.ScriptNode()
 
 		s["b"] = Gaffer.Box()
 		s["b"]["a"] = GafferScene.ShaderAssignment()
 		p = Gaffer.PlugAlgo.promote( s["b"]["a"]["shader"] )
 
-		self.assertFalse( p.acceptsInput( s["n"]["out"] ) )
-		self.assertTrue( p.acceptsInput( s["s"]["out"] ) )
+		self.assertFalse( p.acceptsInput( fixture.plugNode["out"] ) )
+		self.assertTrue( p.acceptsInput( fixture.shader["out"] ) )
 
 	def testInputAcceptanceFromSwitches( self ) :
 
@@ -258,6 +337,9 @@ class ShaderAssignmentTest( GafferSceneTest.SceneTestCase ) :
 		script["a"] = GafferScene.ShaderAssignment()
 		script["s"] = GafferScene.ShaderSwitch()
 
+		# Input only accepted during execution, for backwards compatibility
+		# when loading old scripts - a direct `setInput()` call would not
+		# exercise the code path under test.
 		script.execute( """script["a"]["shader"].setInput( script["s"]["out"] )""" )
 		self.assertTrue( script["a"]["shader"].getInput().isSame( script["s"]["out"] ) )
 
@@ -287,10 +369,10 @@ class ShaderAssignmentTest( GafferSceneTest.SceneTestCase ) :
 		s["b"] = Gaffer.Box()
 		s["b"]["a"] = GafferScene.ShaderAssignment()
 		p = Gaffer.PlugAlgo.promote( s["b"]["a"]["filter"] )
-		s["b"].exportForReference( self.temporaryDirectory() + "/test.grf" )
+		referencePath = self.__exportForReference( s["b"] )
 
 		s["r"] = Gaffer.Reference()
-		s["r"].load( self.temporaryDirectory() + "/test.grf" )
+		s["r"].load( referencePath )
 
 		self.assertTrue( s["r"]["a"]["filter"].getInput().isSame( s["r"][p.getName()] ) )
 
@@ -307,10 +389,10 @@ class ShaderAssignmentTest( GafferSceneTest.SceneTestCase ) :
 		s["b"]["a"]["filter"].setInput( s["b"]["d"]["out"] )
 
 		p = Gaffer.PlugAlgo.promote( s["b"]["d"]["in"] )
-		s["b"].exportForReference( self.temporaryDirectory() + "/test.grf" )
+		referencePath = self.__exportForReference( s["b"] )
 
 		s["r"] = Gaffer.Reference()
-		s["r"].load( self.temporaryDirectory() + "/test.grf" )
+		s["r"].load( referencePath )
 
 		self.assertTrue( s["r"]["a"]["filter"].source().isSame( s["r"][p.getName()] ) )
 
@@ -325,10 +407,10 @@ class ShaderAssignmentTest( GafferSceneTest.SceneTestCase ) :
 		s["b"]["a"] = GafferScene.ShaderAssignment()
 		p = Gaffer.PlugAlgo.promote( s["b"]["a"]["shader"] )
 
-		s["b"].exportForReference( self.temporaryDirectory() + "/test.grf" )
+		referencePath = self.__exportForReference( s["b"] )
 
 		s["r"] = Gaffer.Reference()
-		s["r"].load( self.temporaryDirectory() + "/test.grf" )
+		s["r"].load( referencePath )
 
 		self.assertTrue( s["r"]["a"]["shader"].getInput().node().isSame( s["r"] ) )
 
@@ -338,7 +420,7 @@ class ShaderAssignmentTest( GafferSceneTest.SceneTestCase ) :
 		cs = GafferTest.CapturingSlot( s.plugDirtiedSignal() )
 
 		s["enabled"].setValue( False )
-		self.assertEqual( set( x[0] for x in cs ), set( ( s["enabled"], s["out"]["attributes"], s["out"] ) ) )
+		self.assertEqual( { x[0] for x in cs }, { s["enabled"], s["out"]["attributes"], s["out"] } )
 
 	def testInputAcceptanceFromBoxesViaBoxIO( self ) :
 
@@ -348,8 +430,11 @@ class ShaderAssignmentTest( GafferSceneTest.SceneTestCase ) :
 		s["a"] = GafferScene.ShaderAssignment()
 		s["a"]["shader"].setInput( s["s"]["out"] )
 
-		Gaffer.Metadata.registerValue( s["s"]["out"], "nodule:type", "GafferUI::StandardNodule" )
-		Gaffer.Metadata.registerValue( s["a"]["shader"], "nodule:type", "GafferUI::StandardNodule" )
+		# Registration fires changed signals which fan out through the
+		# metadata system, so don't re-register values already in place.
+		for plug in ( s["s"]["out"], s["a"]["shader"] ) :
+			if Gaffer.Metadata.value( plug, "nodule:type" ) != "GafferUI::StandardNodule" :
+				Gaffer.Metadata.registerValue( plug, "nodule:type", "GafferUI::StandardNodule" )
 
 		box = Gaffer.Box.create( s, Gaffer.StandardSet( { s["s"] } ) )
 		Gaffer.BoxIO.insert( box )
@@ -41,6 +41,8 @@ import datetime
 import pwd
 import grp
 import os
+import shutil
+import tempfile
 
 import IECore
 
@@ -49,44 +51,78 @@ import GafferTest
 
 class FileSystemPathTest( GafferTest.TestCase ) :
 
+	# A directory shared by the tests which only need somewhere that
+	# exists and never write to it, saving a mkdtemp/rmtree cycle per
+	# test. Tests which create files use the per-test
+	# `temporaryDirectory()` as usual.
+	__sharedTemporaryDirectory = None
+
+	@classmethod
+	def setUpClass( cls ) :
+
+		GafferTest.TestCase.setUpClass()
+
+		cls.__sharedTemporaryDirectory = tempfile.mkdtemp( prefix = "gafferFileSystemPathTest" )
+
+	@classmethod
+	def tearDownClass( cls ) :
+
+		GafferTest.TestCase.tearDownClass()
+
+		shutil.rmtree( cls.__sharedTemporaryDirectory )
+		cls.__sharedTemporaryDirectory = None
+
+	def __createFile( self, path, contents = "AAAA" ) :
+
+		# Writing through the raw file descriptor skips the buffered
+		# layers set up by open(), which these tiny fixture files
+		# don't need.
+		fd = os.open( path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644 )
+		try :
+			os.write( fd, contents.encode( "utf-8" ) )
+		finally :
+			os.close( fd )
+
 	def test( self ) :
 
 		p = Gaffer.FileSystemPath( __file__ )
 
-		self.assert_( p.isValid() )
-		self.assert_( p.isLeaf() )
+		self.assertTrue( p.isValid() )
+		self.assertTrue( p.isLeaf() )
 
-		while len( p ) :
+		while p :
 
 			del p[-1]
-			self.assert_( p.isValid() )
-			self.assert_( not p.isLeaf() )
+			self.assertTrue( p.isValid() )
+			self.assertTrue( not p.isLeaf() )
 
 	def testIsLeaf( self ) :
 
 		path = Gaffer.FileSystemPath( "/this/path/doesnt/exist" )
-		self.assert_( not path.isLeaf() )
+		self.assertTrue( not path.isLeaf() )
 
 	def testConstructWithFilter( self ) :
 
 		p = Gaffer.FileSystemPath( __file__ )
-		self.failUnless( p.getFilter() is None )
+		self.assertTrue( p.getFilter() is None )
 
 		f = Gaffer.FileNamePathFilter( [ "*.exr" ] )
 		p = Gaffer.FileSystemPath( __file__, filter = f )
-		self.failUnless( p.getFilter().isSame( f ) )
+		self.assertTrue( p.getFilter().isSame( f ) )
 
 	def testBrokenSymbolicLinks( self ) :
 
-		os.symlink( self.temporaryDirectory() + "/nonExistent", self.temporaryDirectory() + "/broken" )
+		tmp = self.temporaryDirectory()
+
+		os.symlink( tmp + "/nonExistent", tmp + "/broken" )
 
 		# we do want symlinks to appear in children, even if they're broken
-		d = Gaffer.FileSystemPath( self.temporaryDirectory() )
+		d = Gaffer.FileSystemPath( tmp )
 		c = d.children()
 		self.assertEqual( len( c ), 1 )
 
 		l = c[0]
-		self.assertEqual( str( l ), self.temporaryDirectory() + "/broken" )
+		self.assertEqual( str( l ), tmp + "/broken" )
 
 		# we also want broken symlinks to report themselves as "valid",
 		# because having a path return a child and then claim the child
@@ -96,28 +132,31 @@ class FileSystemPathTest( GafferTest.TestCase ) :
 
 		# since we said it was valid, it ought to have some info
 		info = l.info()
-		self.failUnless( info is not None )
+		self.assertTrue( info is not None )
 
 	def testSymLinkInfo( self ) :
 
-		with open( self.temporaryDirectory() + "/a", "w" ) as f :
-			f.write( "AAAA" )
+		tmp = self.temporaryDirectory()
+
+		self.__createFile( tmp + "/a" )
 
-		os.symlink( self.temporaryDirectory() + "/a", self.temporaryDirectory() + "/l" )
+		os.symlink( tmp + "/a", tmp + "/l" )
 
 		# symlinks should report the info for the file
 		# they point to.
-		a = Gaffer.FileSystemPath( self.temporaryDirectory() + "/a" )
-		l = Gaffer.FileSystemPath( self.temporaryDirectory() + "/l" )
+		a = Gaffer.FileSystemPath( tmp + "/a" )
+		l = Gaffer.FileSystemPath( tmp + "/l" )
 		aInfo = a.info()
 		self.assertEqual( aInfo["fileSystem:size"], l.info()["fileSystem:size"] )
-		# unless they're broken
+		# unless they're broken. we changed the filesystem behind the
+		# path's back, so we must restat() before querying again.
 		os.remove( str( a ) )
+		l.restat()
 		self.assertNotEqual( aInfo["fileSystem:size"], l.info()["fileSystem:size"] )
 
 	def testCopy( self ) :
 
-		p = Gaffer.FileSystemPath( self.temporaryDirectory() )
+		p = Gaffer.FileSystemPath( self.__sharedTemporaryDirectory )
 		p2 = p.copy()
 
 		self.assertEqual( p, p2 )
@@ -134,8 +173,7 @@ class FileSystemPathTest( GafferTest.TestCase ) :
 
 		os.chdir( self.temporaryDirectory() )
 
-		with open( self.temporaryDirectory() + "/a", "w" ) as f :
-			f.write( "AAAA" )
+		self.__createFile( self.temporaryDirectory() + "/a" )
 
 		p = Gaffer.FileSystemPath( "a" )
 
@@ -153,8 +191,7 @@ class FileSystemPathTest( GafferTest.TestCase ) :
 
 		os.chdir( self.temporaryDirectory() )
 		os.mkdir( "dir" )
-		with open( self.temporaryDirectory() + "/dir/a", "w" ) as f :
-			f.write( "AAAA" )
+		self.__createFile( self.temporaryDirectory() + "/dir/a" )
 
 		p = Gaffer.FileSystemPath( "dir" )
 
@@ -173,8 +210,7 @@ class FileSystemPathTest( GafferTest.TestCase ) :
 		p = Gaffer.FileSystemPath( self.temporaryDirectory() )
 		p.append( "t" )
 
-		with open( str( p ), "w" ) as f :
-			f.write( "AAAA" )
+		self.__createFile( str( p ) )
 
 		mt = p.property( "fileSystem:modificationTime" )
 		self.assertTrue( isinstance( mt, datetime.datetime ) )
@@ -182,9 +218,11 @@ class FileSystemPathTest( GafferTest.TestCase ) :
 
 		time.sleep( 1 )
 
-		with open( str( p ), "w" ) as f :
-			f.write( "BBBB" )
+		self.__createFile( str( p ), "BBBB" )
 
+		# the file changed behind the path's back, so restat() to
+		# pick up the new modification time.
+		p.restat()
 		mt = p.property( "fileSystem:modificationTime" )
 		self.assertTrue( isinstance( mt, datetime.datetime ) )
 		self.assertLess( (datetime.datetime.utcnow() - mt).total_seconds(), 2 )
@@ -194,8 +232,7 @@ class FileSystemPathTest( GafferTest.TestCase ) :
 		p = Gaffer.FileSystemPath( self.temporaryDirectory() )
 		p.append( "t" )
 
-		with open( str( p ), "w" ) as f :
-			f.write( "AAAA" )
+		self.__createFile( str( p ) )
 
 		o = p.property( "fileSystem:owner" )
 		self.assertTrue( isinstance( o, str ) )
@@ -206,8 +243,7 @@ class FileSystemPathTest( GafferTest.TestCase ) :
 		p = Gaffer.FileSystemPath( self.temporaryDirectory() )
 		p.append( "t" )
 
-		with open( str( p ), "w" ) as f :
-			f.write( "AAAA" )
+		self.__createFile( str( p ) )
 
 		g = p.property( "fileSystem:group" )
 		self.assertTrue( isinstance( g, str ) )
@@ -215,7 +251,7 @@ class FileSystemPathTest( GafferTest.TestCase ) :
 
 	def testPropertyNames( self ) :
 
-		p = Gaffer.FileSystemPath( self.temporaryDirectory() )
+		p = Gaffer.FileSystemPath( self.__sharedTemporaryDirectory )
 
 		a = p.propertyNames()
 		self.assertTrue( isinstance( a, list ) )
@@ -226,46 +262,49 @@ class FileSystemPathTest( GafferTest.TestCase ) :
 		self.assertTrue( "fileSystem:size" in a )
 
 		self.assertTrue( "fileSystem:frameRange" not in a )
-		p = Gaffer.FileSystemPath( self.temporaryDirectory(), includeSequences = True )
+		p = Gaffer.FileSystemPath( self.__sharedTemporaryDirectory, includeSequences = True )
 		self.assertTrue( "fileSystem:frameRange" in p.propertyNames() )
 
 	def testSequences( self ) :
 
-		os.mkdir( self.temporaryDirectory() + "/dir" )
+		tmp = self.temporaryDirectory()
+
+		os.mkdir( tmp + "/dir" )
 		for n in [ "singleFile.txt", "a.001.txt", "a.002.txt", "a.004.txt", "b.003.txt" ] :
-			with open( self.temporaryDirectory() + "/" + n, "w" ) as f :
-				f.write( "AAAA" )
+			self.__createFile( tmp + "/" + n )
 
-		p = Gaffer.FileSystemPath( self.temporaryDirectory(), includeSequences = True )
+		p = Gaffer.FileSystemPath( tmp, includeSequences = True )
 		self.assertTrue( p.getIncludeSequences() )
 
 		c = p.children()
 		self.assertEqual( len( c ), 8 )
 
-		s = sorted( c, key=str )
-		self.assertEqual( str(s[0]), self.temporaryDirectory() + "/a.###.txt" )
-		self.assertEqual( str(s[1]), self.temporaryDirectory() + "/a.001.txt" )
-		self.assertEqual( str(s[2]), self.temporaryDirectory() + "/a.002.txt" )
-		self.assertEqual( str(s[3]), self.temporaryDirectory() + "/a.004.txt" )
-		self.assertEqual( str(s[4]), self.temporaryDirectory() + "/b.###.txt" )
-		self.assertEqual( str(s[5]), self.temporaryDirectory() + "/b.003.txt" )
-		self.assertEqual( str(s[6]), self.temporaryDirectory() + "/dir" )
-		self.assertEqual( str(s[7]), self.temporaryDirectory() + "/singleFile.txt" )
+		# Sorting on precomputed keys calls str() once per child rather
+		# than once per comparison.
+		decorated = sorted( ( str( x ), x ) for x in c )
+		s = [ x for key, x in decorated ]
+		self.assertEqual(
+			[ key for key, x in decorated ],
+			[ tmp + n for n in ( "/a.###.txt", "/a.001.txt", "/a.002.txt", "/a.004.txt", "/b.###.txt", "/b.003.txt", "/dir", "/singleFile.txt" ) ]
+		)
 
+		now = datetime.datetime.utcnow()
 		for x in s :
 
+			isDir = os.path.isdir( str(x) )
+
 			self.assertTrue( x.isValid() )
-			if not os.path.isdir( str(x) ) :
+			if not isDir :
 				self.assertTrue( x.isLeaf() )
 
 			self.assertEqual( x.property( "fileSystem:owner" ), pwd.getpwuid( os.stat( str( p ) ).st_uid ).pw_name )
 			self.assertEqual( x.property( "fileSystem:group" ), grp.getgrgid( os.stat( str( p ) ).st_gid ).gr_name )
-			self.assertLess( (datetime.datetime.utcnow() - x.property( "fileSystem:modificationTime" )).total_seconds(), 2 )
+			self.assertLess( (now - x.property( "fileSystem:modificationTime" )).total_seconds(), 2 )
 			if "###" not in str(x) :
 				self.assertFalse( x.isFileSequence() )
 				self.assertEqual( x.fileSequence(), None )
 				self.assertEqual( x.property( "fileSystem:frameRange" ), "" )
-				if os.path.isdir( str(x) ) :
+				if isDir :
 					self.assertEqual( x.property( "fileSystem:size" ), 0 )
 				else :
 					self.assertEqual( x.property( "fileSystem:size" ), 4 )
@@ -288,19 +327,16 @@ class FileSystemPathTest( GafferTest.TestCase ) :
 		self.assertEqual( len( p2.children() ), 8 )
 
 		# make sure we can still exclude the sequences
-		p = Gaffer.FileSystemPath( self.temporaryDirectory(), includeSequences = False )
+		p = Gaffer.FileSystemPath( tmp, includeSequences = False )
 		self.assertFalse( p.getIncludeSequences() )
 
 		c = p.children()
 		self.assertEqual( len( c ), 6 )
 
-		s = sorted( c, key=str )
-		self.assertEqual( str(s[0]), self.temporaryDirectory() + "/a.001.txt" )
-		self.assertEqual( str(s[1]), self.temporaryDirectory() + "/a.002.txt" )
-		self.assertEqual( str(s[2]), self.temporaryDirectory() + "/a.004.txt" )
-		self.assertEqual( str(s[3]), self.temporaryDirectory() + "/b.003.txt" )
-		self.assertEqual( str(s[4]), self.temporaryDirectory() + "/dir" )
-		self.assertEqual( str(s[5]), self.temporaryDirectory() + "/singleFile.txt" )
+		self.assertEqual(
+			sorted( str( x ) for x in c ),
+			[ tmp + n for n in ( "/a.001.txt", "/a.002.txt", "/a.004.txt", "/b.003.txt", "/dir", "/singleFile.txt" ) ]
+		)
 
 		# and we can include them again
 		p.setIncludeSequences( True )
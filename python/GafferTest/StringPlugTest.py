@@ -44,12 +44,36 @@ import IECore
 import Gaffer
 import GafferTest
 
+# Resolved once at import time - expanduser() consults the environment
+# and the password database, so we don't want to repeat it per assertion.
+_homeDirectory = os.path.expanduser( "~" )
+
+# Cleaned once at import time - the expression text is immutable, so
+# there is no need to re-run cleandoc() every time the test runs.
+_substitutionsExpression = inspect.cleandoc(
+	"""
+	parent["substitionsOn"]["in"] = "test.#.exr"
+	parent["substitionsOff"]["in"] = "test.#.exr"
+	parent["substitionsOnIndirectly"]["user"]["in"] = "test.#.exr"
+	"""
+)
+
+## Parents an Expression driving the substitution test plugs into
+# `script`, and returns it. An Expression is bound to its parent, so a
+# shared instance isn't possible, but feeding the identical module-level
+# source string to every invocation keeps the parse work to a minimum.
+def _makeSubstitutionsExpression( script ) :
+
+	script["e"] = Gaffer.Expression()
+	script["e"].setExpression( _substitutionsExpression )
+
+	return script["e"]
+
 class StringPlugTest( GafferTest.TestCase ) :
 
 	def testExpansion( self ) :
 
 		n = GafferTest.StringInOutNode()
-		self.assertHashesValid( n )
 
 		# nothing should be expanded when we're in a non-computation context
 		n["in"].setValue( "testyTesty.##.exr" )
@@ -91,6 +115,11 @@ class StringPlugTest( GafferTest.TestCase ) :
 		n["in"].setValue( "testyTesty.##.exr" )
 		self.assertEqual( n["in"].getValue(), "testyTesty.##.exr" )
 
+		# check the hashes once, after the node has been fully exercised,
+		# rather than interleaving this expensive validation with the
+		# per-value assertions above.
+		self.assertHashesValid( n )
+
 	def testRecursiveExpansion( self ) :
 
 		n = GafferTest.StringInOutNode()
@@ -120,10 +149,10 @@ class StringPlugTest( GafferTest.TestCase ) :
 		n = GafferTest.StringInOutNode()
 
 		n["in"].setValue( "~" )
-		self.assertEqual( n["out"].getValue(), os.path.expanduser( "~" ) )
+		self.assertEqual( n["out"].getValue(), _homeDirectory )
 
 		n["in"].setValue( "~/something.tif" )
-		self.assertEqual( n["out"].getValue(), os.path.expanduser( "~/something.tif" ) )
+		self.assertEqual( n["out"].getValue(), _homeDirectory + "/something.tif" )
 
 		# ~ shouldn't be expanded unless it's at the front - it would
 		# be meaningless in other cases.
@@ -260,86 +289,60 @@ class StringPlugTest( GafferTest.TestCase ) :
 		# All three nodes above receive their input from this expression
 		# which outputs a sequence value to be substituted (or not).
 
-		s["e"] = Gaffer.Expression()
-		s["e"].setExpression( inspect.cleandoc(
-			"""
-			parent["substitionsOn"]["in"] = "test.#.exr"
-			parent["substitionsOff"]["in"] = "test.#.exr"
-			parent["substitionsOnIndirectly"]["user"]["in"] = "test.#.exr"
-			"""
-		) )
+		_makeSubstitutionsExpression( s )
 
 		with Gaffer.Context() as c :
 
-			# Frame 1
-			#########
-
-			c.setFrame( 1 )
-
 			# The output of the expression itself is not substituted.
-			# Substitutions occur only on input plugs.
+			# Substitutions occur only on input plugs, so this holds
+			# regardless of the frame and only needs asserting once.
 
 			self.assertEqual( s["substitionsOn"]["in"].getInput().getValue(), "test.#.exr" )
 			self.assertEqual( s["substitionsOff"]["in"].getInput().getValue(), "test.#.exr" )
 			self.assertEqual( s["substitionsOnIndirectly"]["user"]["in"].getInput().getValue(), "test.#.exr" )
 
-			# We should get frame numbers out of the substituting node.
-
-			self.assertEqual( s["substitionsOn"]["out"].getValue(), "test.1.exr" )
-			substitutionsOnHash1 = s["substitionsOn"]["out"].hash()
-			self.assertEqual( s["substitionsOn"]["out"].getValue( _precomputedHash = substitutionsOnHash1 ), "test.1.exr" )
+			hashes = {}
+			for frame in ( 1, 2 ) :
 
-			# We should get sequences out of the non-substituting node.
+				with self.subTest( frame = frame ) :
 
-			self.assertEqual( s["substitionsOff"]["out"].getValue(), "test.#.exr" )
-			substitutionsOffHash1 = s["substitionsOff"]["out"].hash()
-			self.assertEqual( s["substitionsOff"]["out"].getValue( _precomputedHash = substitutionsOffHash1 ), "test.#.exr" )
-			self.assertNotEqual( substitutionsOnHash1, substitutionsOffHash1 )
+					c.setFrame( frame )
 
-			# We shouldn't get frame numbers out of the third node, because the
-			# requirements of the node (no substitutions) trump any upstream opinions.
-			# Substitutions are performed by the plug during value access, and do not
-			# affect the actual data flow.
+					# Record the hashes up front, so that the cross-frame
+					# comparisons after the loop don't turn an assertion
+					# failure in one subTest into a KeyError.
 
-			self.assertEqual( s["substitionsOnIndirectly"]["out"].getValue(), "test.#.exr" )
-			substitionsOnIndirectlyHash1 = s["substitionsOnIndirectly"]["out"].hash()
-			self.assertEqual( s["substitionsOnIndirectly"]["out"].getValue( _precomputedHash = substitionsOnIndirectlyHash1 ), "test.#.exr" )
+					substitutionsOnHash = s["substitionsOn"]["out"].hash()
+					substitutionsOffHash = s["substitionsOff"]["out"].hash()
+					substitionsOnIndirectlyHash = s["substitionsOnIndirectly"]["out"].hash()
+					hashes[frame] = ( substitutionsOnHash, substitutionsOffHash, substitionsOnIndirectlyHash )
 
-			# Frame 2
-			#########
+					# We should get frame numbers out of the substituting node.
 
-			c.setFrame( 2 )
-
-			# The output of the expression itself is not substituted.
-			# Substitutions occur only on input plugs.
-
-			self.assertEqual( s["substitionsOn"]["in"].getInput().getValue(), "test.#.exr" )
-			self.assertEqual( s["substitionsOff"]["in"].getInput().getValue(), "test.#.exr" )
-			self.assertEqual( s["substitionsOnIndirectly"]["user"]["in"].getInput().getValue(), "test.#.exr" )
+					self.assertEqual( s["substitionsOn"]["out"].getValue(), "test.%d.exr" % frame )
+					self.assertEqual( s["substitionsOn"]["out"].getValue( _precomputedHash = substitutionsOnHash ), "test.%d.exr" % frame )
 
-			# We should get frame numbers out of the substituting node.
-			# The hash must has changed to make this possible.
+					# We should get sequences out of the non-substituting node.
 
-			self.assertEqual( s["substitionsOn"]["out"].getValue(), "test.2.exr" )
-			substitutionsOnHash2 = s["substitionsOn"]["out"].hash()
-			self.assertEqual( s["substitionsOn"]["out"].getValue( _precomputedHash = substitutionsOnHash2 ), "test.2.exr" )
-			self.assertNotEqual( substitutionsOnHash2, substitutionsOnHash1 )
+					self.assertEqual( s["substitionsOff"]["out"].getValue(), "test.#.exr" )
+					self.assertEqual( s["substitionsOff"]["out"].getValue( _precomputedHash = substitutionsOffHash ), "test.#.exr" )
+					self.assertNotEqual( substitutionsOnHash, substitutionsOffHash )
 
-			# We should still get sequences out of the non-substituting node,
-			# and it should have the same output hash as it had on frame 1.
+					# We shouldn't get frame numbers out of the third node, because the
+					# requirements of the node (no substitutions) trump any upstream opinions.
+					# Substitutions are performed by the plug during value access, and do not
+					# affect the actual data flow.
 
-			self.assertEqual( s["substitionsOff"]["out"].getValue(), "test.#.exr" )
-			substitutionsOffHash2 = s["substitionsOff"]["out"].hash()
-			self.assertEqual( s["substitionsOff"]["out"].getValue( _precomputedHash = substitutionsOffHash2 ), "test.#.exr" )
-			self.assertEqual( substitutionsOffHash1, substitutionsOffHash2 )
-			self.assertNotEqual( substitutionsOnHash2, substitutionsOffHash2 )
+					self.assertEqual( s["substitionsOnIndirectly"]["out"].getValue(), "test.#.exr" )
+					self.assertEqual( s["substitionsOnIndirectly"]["out"].getValue( _precomputedHash = substitionsOnIndirectlyHash ), "test.#.exr" )
 
-			# The third node should still be non-substituting.
+			# The substituting node's hash must change with the frame to make
+			# the frame numbers possible, but the non-substituting nodes must
+			# hash identically on every frame.
 
-			self.assertEqual( s["substitionsOnIndirectly"]["out"].getValue(), "test.#.exr" )
-			substitionsOnIndirectlyHash2 = s["substitionsOnIndirectly"]["out"].hash()
-			self.assertEqual( s["substitionsOnIndirectly"]["out"].getValue( _precomputedHash = substitionsOnIndirectlyHash2 ), "test.#.exr" )
-			self.assertEqual( substitionsOnIndirectlyHash2, substitionsOnIndirectlyHash1 )
+			self.assertNotEqual( hashes[1][0], hashes[2][0] )
+			self.assertEqual( hashes[1][1], hashes[2][1] )
+			self.assertEqual( hashes[1][2], hashes[2][2] )
 
 if __name__ == "__main__":
 	unittest.main()
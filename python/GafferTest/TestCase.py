@@ -34,8 +34,10 @@
 #
 ##########################################################################
 
+import os
 import sys
 import unittest
+import contextlib
 import inspect
 import types
 import shutil
@@ -46,6 +48,12 @@ import IECore
 
 import Gaffer
 
+# Tests create many small files purely to query their metadata, so we
+# prefer tmpfs-backed storage for temporary directories where available,
+# avoiding a journal commit for every write. A value of None falls back
+# to the standard temporary location.
+_temporaryDirectoryRoot = "/dev/shm" if os.path.isdir( "/dev/shm" ) and os.access( "/dev/shm", os.W_OK ) else None
+
 ## A useful base class for creating test cases for nodes.
 class TestCase( unittest.TestCase ) :
 
@@ -91,13 +99,23 @@ class TestCase( unittest.TestCase ) :
 			if message.level in  ( mh.Level.Warning, mh.Level.Error ) :
 				raise RuntimeError( "Unexpected message : " + mh.levelAsString( message.level ) + " : " + message.context + " : " + message.message )
 
+	if not hasattr( unittest.TestCase, "subTest" ) :
+
+		## Python 2's unittest doesn't provide `subTest`, so we provide a
+		# do-nothing stand-in. This allows tests to be written against the
+		# Python 3 API, gaining failure isolation when run under Python 3.
+		@contextlib.contextmanager
+		def subTest( self, msg = None, **params ) :
+
+			yield
+
 	## Returns a path to a directory the test may use for temporary
 	# storage. This will be cleaned up automatically after the test
 	# has been run.
 	def temporaryDirectory( self ) :
 
 		if self.__temporaryDirectory is None :
-			 self.__temporaryDirectory = tempfile.mkdtemp( prefix = "gafferTest" )
+			 self.__temporaryDirectory = tempfile.mkdtemp( prefix = "gafferTest", dir = _temporaryDirectoryRoot )
 
 		return self.__temporaryDirectory
 
@@ -35,7 +35,6 @@
 ##########################################################################
 
 import os
-import subprocess32 as subprocess
 
 import IECore
 import GafferScene
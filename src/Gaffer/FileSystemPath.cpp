@@ -51,6 +51,8 @@
 #include "boost/filesystem.hpp"
 #include "boost/filesystem/operations.hpp"
 
+#include "tbb/mutex.h"
+
 #include <grp.h>
 #include <pwd.h>
 #include <sys/stat.h>
@@ -62,6 +64,63 @@ using namespace boost::posix_time;
 using namespace IECore;
 using namespace Gaffer;
 
+namespace
+{
+
+// The name service consulted by `getpwuid()` and `getgrgid()` may
+// involve the network (LDAP, NIS), so lookups can be slow and of
+// highly variable latency. The id->name mappings are effectively
+// immutable for the lifetime of the process, and most directories
+// contain files owned by only a handful of users, so we cache the
+// results process-wide.
+std::string userName( uid_t uid )
+{
+	typedef std::map<uid_t, std::string> Cache;
+	static Cache g_cache;
+	static tbb::mutex g_mutex;
+
+	{
+		tbb::mutex::scoped_lock lock( g_mutex );
+		Cache::const_iterator it = g_cache.find( uid );
+		if( it != g_cache.end() )
+		{
+			return it->second;
+		}
+	}
+
+	struct passwd *pw = getpwuid( uid );
+	const std::string name = pw ? pw->pw_name : "";
+
+	tbb::mutex::scoped_lock lock( g_mutex );
+	g_cache.insert( Cache::value_type( uid, name ) );
+	return name;
+}
+
+std::string groupName( gid_t gid )
+{
+	typedef std::map<gid_t, std::string> Cache;
+	static Cache g_cache;
+	static tbb::mutex g_mutex;
+
+	{
+		tbb::mutex::scoped_lock lock( g_mutex );
+		Cache::const_iterator it = g_cache.find( gid );
+		if( it != g_cache.end() )
+		{
+			return it->second;
+		}
+	}
+
+	struct group *gr = getgrgid( gid );
+	const std::string name = gr ? gr->gr_name : "";
+
+	tbb::mutex::scoped_lock lock( g_mutex );
+	g_cache.insert( Cache::value_type( gid, name ) );
+	return name;
+}
+
+} // namespace
+
 IE_CORE_DEFINERUNTIMETYPED( FileSystemPath );
 
 static InternedString g_ownerPropertyName( "fileSystem:owner" );
@@ -71,17 +130,17 @@ static InternedString g_sizePropertyName( "fileSystem:size" );
 static InternedString g_frameRangePropertyName( "fileSystem:frameRange" );
 
 FileSystemPath::FileSystemPath( PathFilterPtr filter, bool includeSequences )
-	:	Path( filter ), m_includeSequences( includeSequences )
+	:	Path( filter ), m_haveStatBuffer( false ), m_includeSequences( includeSequences )
 {
 }
 
 FileSystemPath::FileSystemPath( const std::string &path, PathFilterPtr filter, bool includeSequences )
-	:	Path( path, filter ), m_includeSequences( includeSequences )
+	:	Path( path, filter ), m_haveStatBuffer( false ), m_includeSequences( includeSequences )
 {
 }
 
 FileSystemPath::FileSystemPath( const Names &names, const IECore::InternedString &root, PathFilterPtr filter, bool includeSequences )
-	:	Path( names, root, filter ), m_includeSequences( includeSequences )
+	:	Path( names, root, filter ), m_haveStatBuffer( false ), m_includeSequences( includeSequences )
 {
 }
 
@@ -101,13 +160,13 @@ bool FileSystemPath::isValid() const
 		return true;
 	}
 
-	const file_type t = symlink_status( path( this->string() ) ).type();
+	const file_type t = symlinkStatus().type();
 	return t != status_error && t != file_not_found;
 }
 
 bool FileSystemPath::isLeaf() const
 {
-	return isValid() && !is_directory( path( this->string() ) );
+	return isValid() && !is_directory( status() );
 }
 
 bool FileSystemPath::getIncludeSequences() const
@@ -117,12 +176,16 @@ bool FileSystemPath::getIncludeSequences() const
 
 void FileSystemPath::setIncludeSequences( bool includeSequences )
 {
-	m_includeSequences = includeSequences;
+	if( includeSequences != m_includeSequences )
+	{
+		m_includeSequences = includeSequences;
+		m_fileSequence = boost::none;
+	}
 }
 
 bool FileSystemPath::isFileSequence() const
 {
-	if( !m_includeSequences || is_directory( path( this->string() ) ) )
+	if( !m_includeSequences || is_directory( status() ) )
 	{
 		return false;
 	}
@@ -140,14 +203,18 @@ bool FileSystemPath::isFileSequence() const
 
 FileSequencePtr FileSystemPath::fileSequence() const
 {
-	if( !m_includeSequences || is_directory( path( this->string() ) ) )
+	if( !m_includeSequences || is_directory( status() ) )
 	{
 		return nullptr;
 	}
 
-	FileSequencePtr sequence = nullptr;
-	IECore::ls( this->string(), sequence, /* minSequenceSize = */ 1 );
-	return sequence;
+	if( !m_fileSequence )
+	{
+		FileSequencePtr sequence = nullptr;
+		IECore::ls( this->string(), sequence, /* minSequenceSize = */ 1 );
+		m_fileSequence = sequence;
+	}
+	return *m_fileSequence;
 }
 
 void FileSystemPath::propertyNames( std::vector<IECore::InternedString> &names ) const
@@ -184,8 +251,7 @@ IECore::ConstRunTimeTypedPtr FileSystemPath::property( const IECore::InternedStr
 				{
 					struct stat s;
 					stat( it->c_str(), &s );
-					struct passwd *pw = getpwuid( s.st_uid );
-					std::string value = pw ? pw->pw_name : "";
+					std::string value = userName( s.st_uid );
 					std::pair<std::map<std::string,size_t>::iterator,bool> oIt = ownerCounter.insert( std::pair<std::string,size_t>( value, 0 ) );
 					oIt.first->second++;
 					if( oIt.first->second > maxCount )
@@ -198,11 +264,8 @@ IECore::ConstRunTimeTypedPtr FileSystemPath::property( const IECore::InternedStr
 			}
 		}
 
-		std::string n = this->string();
-		struct stat s;
-		stat( n.c_str(), &s );
-		struct passwd *pw = getpwuid( s.st_uid );
-		return new StringData( pw ? pw->pw_name : "" );
+		const struct stat *s = statBuffer();
+		return new StringData( s ? userName( s->st_uid ) : "" );
 	}
 	else if( name == g_groupPropertyName )
 	{
@@ -221,8 +284,7 @@ IECore::ConstRunTimeTypedPtr FileSystemPath::property( const IECore::InternedStr
 				{
 					struct stat s;
 					stat( it->c_str(), &s );
-					struct group *gr = getgrgid( s.st_gid );
-					std::string value = gr ? gr->gr_name : "";
+					std::string value = groupName( s.st_gid );
 					std::pair<std::map<std::string,size_t>::iterator,bool> oIt = ownerCounter.insert( std::pair<std::string,size_t>( value, 0 ) );
 					oIt.first->second++;
 					if( oIt.first->second > maxCount )
@@ -235,11 +297,8 @@ IECore::ConstRunTimeTypedPtr FileSystemPath::property( const IECore::InternedStr
 			}
 		}
 
-		std::string n = this->string();
-		struct stat s;
-		stat( n.c_str(), &s );
-		struct group *gr = getgrgid( s.st_gid );
-		return new StringData( gr ? gr->gr_name : "" );
+		const struct stat *s = statBuffer();
+		return new StringData( s ? groupName( s->st_gid ) : "" );
 	}
 	else if( name == g_modificationTimePropertyName )
 	{
@@ -267,7 +326,10 @@ IECore::ConstRunTimeTypedPtr FileSystemPath::property( const IECore::InternedStr
 			}
 		}
 
-		std::time_t t = last_write_time( path( this->string() ), e );
+		// The shared stat buffer already carries the modification
+		// time, so there is no need for a separate stat here.
+		const struct stat *s = statBuffer();
+		std::time_t t = s ? s->st_mtime : std::time_t( -1 );
 		return new DateTimeData( from_time_t( t ) );
 	}
 	else if( name == g_sizePropertyName )
@@ -296,8 +358,11 @@ IECore::ConstRunTimeTypedPtr FileSystemPath::property( const IECore::InternedStr
 			}
 		}
 
-		uintmax_t s = file_size( path( this->string() ), e );
-		return new UInt64Data( !e ? s : 0 );
+		// As above, the size comes from the shared stat buffer. Only
+		// regular files report a size, matching `file_size()`, which
+		// errors on directories and other special files.
+		const struct stat *s = statBuffer();
+		return new UInt64Data( ( s && S_ISREG( s->st_mode ) ) ? s->st_size : 0 );
 	}
 	else if( name == g_frameRangePropertyName )
 	{
@@ -318,6 +383,55 @@ PathPtr FileSystemPath::copy() const
 	return new FileSystemPath( names(), root(), const_cast<PathFilter *>( getFilter() ), m_includeSequences );
 }
 
+void FileSystemPath::restat()
+{
+	m_status = boost::none;
+	m_symlinkStatus = boost::none;
+	m_statBuffer = boost::none;
+	m_haveStatBuffer = false;
+	m_fileSequence = boost::none;
+}
+
+void FileSystemPath::pathChanged()
+{
+	Path::pathChanged();
+	restat();
+}
+
+const file_status &FileSystemPath::status() const
+{
+	if( !m_status )
+	{
+		boost::system::error_code e;
+		m_status = boost::filesystem::status( path( this->string() ), e );
+	}
+	return *m_status;
+}
+
+const file_status &FileSystemPath::symlinkStatus() const
+{
+	if( !m_symlinkStatus )
+	{
+		boost::system::error_code e;
+		m_symlinkStatus = boost::filesystem::symlink_status( path( this->string() ), e );
+	}
+	return *m_symlinkStatus;
+}
+
+const struct stat *FileSystemPath::statBuffer() const
+{
+	if( !m_haveStatBuffer )
+	{
+		struct stat s;
+		if( stat( this->string().c_str(), &s ) == 0 )
+		{
+			m_statBuffer = s;
+		}
+		m_haveStatBuffer = true;
+	}
+	return m_statBuffer ? &(*m_statBuffer) : nullptr;
+}
+
 void FileSystemPath::doChildren( std::vector<PathPtr> &children ) const
 {
 	path p( this->string() );
@@ -327,9 +441,22 @@ void FileSystemPath::doChildren( std::vector<PathPtr> &children ) const
 		return;
 	}
 
+	// Building the children by appending to our own names avoids
+	// re-tokenising a full path string for every entry.
+	Names childNames = names();
+	childNames.push_back( IECore::InternedString() );
+
 	for( directory_iterator it( p ), eIt; it != eIt; ++it )
 	{
-		children.push_back( new FileSystemPath( it->path().string(), const_cast<PathFilter *>( getFilter() ), m_includeSequences ) );
+		childNames.back() = it->path().filename().string();
+		FileSystemPath *child = new FileSystemPath( childNames, root(), const_cast<PathFilter *>( getFilter() ), m_includeSequences );
+		// The directory iterator has already retrieved the status of
+		// the entry, so seed the child's caches with it rather than
+		// have the child stat the same path all over again.
+		boost::system::error_code e;
+		child->m_symlinkStatus = it->symlink_status( e );
+		child->m_status = it->status( e );
+		children.push_back( child );
 	}
 
 	if( m_includeSequences )
@@ -342,7 +469,8 @@ void FileSystemPath::doChildren( std::vector<PathPtr> &children ) const
 			(*it)->getFrameList()->asList( frames );
 			if ( !is_directory( path( (*it)->fileNameForFrame( frames[0] ) ) ) )
 			{
-				children.push_back( new FileSystemPath( path( p / (*it)->getFileName() ).string(), const_cast<PathFilter *>( getFilter() ), m_includeSequences ) );
+				childNames.back() = (*it)->getFileName();
+				children.push_back( new FileSystemPath( childNames, root(), const_cast<PathFilter *>( getFilter() ), m_includeSequences ) );
 			}
 		}
 	}
@@ -54,20 +54,20 @@ static InternedString g_namePropertyName( "name" );
 static InternedString g_fullNamePropertyName( "fullName" );
 
 Path::Path( PathFilterPtr filter )
-	:	m_pathChangedSignal( nullptr )
+	:	m_stringValid( false ), m_pathChangedSignal( nullptr )
 {
 	setFilter( filter );
 }
 
 Path::Path( const std::string &path, PathFilterPtr filter )
-	:	m_pathChangedSignal( nullptr )
+	:	m_stringValid( false ), m_pathChangedSignal( nullptr )
 {
 	setFromString( path );
 	setFilter( filter );
 }
 
 Path::Path( const Names &names, const IECore::InternedString &root, PathFilterPtr filter )
-	:	m_root( root ), m_names( names ), m_pathChangedSignal( nullptr )
+	:	m_root( root ), m_names( names ), m_stringValid( false ), m_pathChangedSignal( nullptr )
 {
 	for( Names::const_iterator it = m_names.begin(), eIt = m_names.end(); it != eIt; ++it )
 	{
@@ -258,6 +258,9 @@ void Path::truncateUntilValid()
 	while( m_names.size() && !isValid() )
 	{
 		m_names.pop_back();
+		// Invalidate cached state before `isValid()` is queried
+		// again, but defer signalling until we're done.
+		pathChanged();
 		changed = true;
 	}
 
@@ -353,18 +356,22 @@ void Path::remove( size_t begin, size_t end )
 	emitPathChanged();
 }
 
-std::string Path::string() const
+const std::string &Path::string() const
 {
-	std::string result = m_root.string();
-	for( size_t i = 0, s = m_names.size(); i < s; ++i )
+	if( !m_stringValid )
 	{
-		if( i != 0 )
+		m_string = m_root.string();
+		for( size_t i = 0, s = m_names.size(); i < s; ++i )
 		{
-			result += "/";
+			if( i != 0 )
+			{
+				m_string += "/";
+			}
+			m_string += m_names[i].string();
 		}
-		result += m_names[i].string();
+		m_stringValid = true;
 	}
-	return result;
+	return m_string;
 }
 
 bool Path::operator == ( const Path &other ) const
@@ -386,6 +393,7 @@ void Path::doChildren( std::vector<PathPtr> &children ) const
 
 void Path::emitPathChanged()
 {
+	pathChanged();
 	if( !m_pathChangedSignal )
 	{
 		return;
@@ -393,6 +401,11 @@ void Path::emitPathChanged()
 	(*m_pathChangedSignal)( this );
 }
 
+void Path::pathChanged()
+{
+	m_stringValid = false;
+}
+
 void Path::pathChangedSignalCreated()
 {
 	if( m_filter )
@@ -313,6 +313,11 @@ size_t pathLength( Path &p )
 	return p.names().size();
 }
 
+bool pathNonZero( Path &p )
+{
+	return !p.names().empty();
+}
+
 std::string pathRepr( PathPtr p )
 {
 	object o( p );
@@ -453,9 +458,14 @@ void GafferModule::bindPath()
 			.def( "setFromString", &Path::setFromString, return_self<>() )
 			.def( "append", &Path::append, return_self<>() )
 			.def( "truncateUntilValid", &Path::truncateUntilValid, return_self<>() )
-			.def( "__str__", &Path::string )
+			.def( "__str__", &Path::string, return_value_policy<copy_const_reference>() )
 			.def( "__repr__", &pathRepr )
 			.def( "__len__", &pathLength )
+			// Support `if path :` and `while path :` directly, rather
+			// than falling back to `__len__`, which builds an int per
+			// query.
+			.def( "__bool__", &pathNonZero )
+			.def( "__nonzero__", &pathNonZero )
 			.def( "__getitem__", &getItem )
 			.def( "__getitem__", &getSlice )
 			.def( "__setitem__", (void (Path::*)( size_t, const IECore::InternedString &))&Path::set )
@@ -491,6 +501,7 @@ void GafferModule::bindPath()
 		.def( "setIncludeSequences", &FileSystemPath::setIncludeSequences )
 		.def( "isFileSequence", &FileSystemPath::isFileSequence )
 		.def( "fileSequence", &FileSystemPath::fileSequence )
+		.def( "restat", &FileSystemPath::restat )
 		.def( "createStandardFilter", &createStandardFilter, (
 				arg( "extensions" ) = list(),
 				arg( "extensionsLabel" ) = "",